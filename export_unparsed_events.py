@@ -11,10 +11,19 @@ Usage:
 """
 
 import argparse
+import hashlib
+import heapq
+import json
+import os
+import queue
 import sys
-from collections import defaultdict
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 import logging
 
 logging.getLogger("taegis_sdk_python.utils").setLevel(logging.ERROR)
@@ -29,21 +38,56 @@ except ImportError:
     sys.exit(1)
 
 
-def get_next_page(events_results: List) -> str:
-    """Retrieve events next page indicator."""
+MAX_INFLIGHT_PAGES = 16
+CACHE_DIR = Path("~/.cache/taegis").expanduser()
+CACHE_TTL_SECONDS = 3600
+WRITE_CHUNK_SIZE = 1 << 20
+WRITE_QUEUE_DEPTH = 4
+SPOOL_BUFFER_SIZE = 8 << 20
+TOP_SOURCES = 50
+
+# CQL templates; string values must be passed through cql_string()
+UNPARSED_QUERY = "FROM generic EARLIEST={time_range}"
+UNPARSED_SOURCE_QUERY = "FROM generic WHERE sensor_id={sensor_id} AND sensor_type={sensor_type} EARLIEST={time_range}"
+
+
+def cql_string(value: str) -> str:
+    """Quote a value as a CQL string literal, escaping embedded single quotes."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def get_next_pages(events_results: List) -> List[str]:
+    """Retrieve every distinct next page indicator from a result set."""
+    next_pages = []
     for result in events_results:
-        if hasattr(result, 'next') and result.next:
-            return result.next
-    return None
+        # SDK v2 exposes the page token as `next_`; older releases used `next`
+        next_page = getattr(result, 'next_', None) or getattr(result, 'next', None)
+        if next_page and next_page not in next_pages:
+            next_pages.append(next_page)
+    return next_pages
 
 
-def query_events(
+def collect_rows(events_results: List) -> List[Dict]:
+    """Collect rows from every result in a result set."""
+    rows = []
+    for r in events_results:
+        if r.result and r.result.rows:
+            rows.extend(r.result.rows)
+    return rows
+
+
+def iter_events(
     service: GraphQLService,
     query: str,
     tenant_id: str,
     max_rows: int = 1000
-) -> List[Dict]:
-    """Query events and return all rows from all pages."""
+) -> Iterator[Dict]:
+    """Query events and yield rows from all pages as each page arrives.
+
+    Pages are fetched concurrently: up to MAX_INFLIGHT_PAGES page requests
+    are kept in flight, and whenever one completes its rows are yielded and
+    any newly discovered next page tokens are submitted to refill the window.
+    """
     options = EventQueryOptions(
         timestamp_ascending=True,
         page_size=1000,
@@ -52,81 +96,248 @@ def query_events(
         aggregation_off=False,
     )
 
-    all_rows = []
-    results = []
-
-    # Initial query
+    # Initial query. The SDK runs every call on a fresh thread and reads the
+    # context set by the thread that created the service, so this block stays
+    # open, across yields too, until the last page has been fetched: that is
+    # what scopes the page requests below to the tenant.
     with service(tenant_id=tenant_id):
         result_list = service.events.subscription.event_query(
             query=query,
             options=options,
             metadata={"callerName": "export_unparsed_events"},
         )
-        results.extend(result_list)
-
-        # Collect rows from initial results
-        for r in result_list:
-            if r.result and r.result.rows:
-                all_rows.extend(r.result.rows)
+        yield from collect_rows(result_list)
 
         # Paginate through remaining results
-        next_page = get_next_page(result_list)
-        while next_page:
-            page_result_list = service.events.subscription.event_page(next_page)
-            results.extend(page_result_list)
-
-            for r in page_result_list:
-                if r.result and r.result.rows:
-                    all_rows.extend(r.result.rows)
-
-            next_page = get_next_page(page_result_list)
+        backlog = get_next_pages(result_list)
+        seen = set(backlog)
+        in_flight = set()
+        with ThreadPoolExecutor(max_workers=MAX_INFLIGHT_PAGES) as executor:
+            while backlog or in_flight:
+                while backlog and len(in_flight) < MAX_INFLIGHT_PAGES:
+                    in_flight.add(executor.submit(service.events.subscription.event_page, backlog.pop(0)))
+
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page_result_list = future.result()
+                    for next_page in get_next_pages(page_result_list):
+                        if next_page not in seen:
+                            seen.add(next_page)
+                            backlog.append(next_page)
+                    yield from collect_rows(page_result_list)
+
+
+def get_cache_path(environment: str, tenant_id: str, query: str, max_rows: int) -> Path:
+    """Return the cache file path for a query."""
+    key = hashlib.sha256(f"{environment}|{tenant_id}|{query}|{max_rows}".encode('utf-8')).hexdigest()
+    return CACHE_DIR / f"{key}.jsonl"
+
+
+def prune_cache() -> None:
+    """Delete cache entries, and temp files left by killed runs, older than CACHE_TTL_SECONDS."""
+    cutoff = time.time() - CACHE_TTL_SECONDS
+    try:
+        entries = list(CACHE_DIR.iterdir())
+    except OSError:
+        return
+    for entry in entries:
+        if entry.suffix not in ('.jsonl', '.tmp'):
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                entry.unlink()
+        except OSError:
+            pass
 
-    return all_rows
 
+def discard_cache_file(cache_file, tmp_path: Path) -> None:
+    """Close and delete a partially written cache file."""
+    try:
+        cache_file.close()
+    except OSError:
+        pass
+    try:
+        tmp_path.unlink(missing_ok=True)
+    except OSError:
+        pass
 
-def aggregate_by_sensor(events: List[Dict]) -> Dict[Tuple[str, str], List[Dict]]:
-    """Aggregate events by sensor_id and sensor_type."""
-    aggregated = defaultdict(list)
 
-    for event in events:
-        # Handle None values and missing keys
-        sensor_id = event.get('sensor_id') or 'unknown'
-        sensor_type = event.get('sensor_type') or 'unknown'
-        # Convert to string in case they're not already
-        sensor_id = str(sensor_id) if sensor_id is not None else 'unknown'
-        sensor_type = str(sensor_type) if sensor_type is not None else 'unknown'
-        key = (sensor_id, sensor_type)
-        aggregated[key].append(event)
+def iter_cached_events(
+    service: GraphQLService,
+    query: str,
+    tenant_id: str,
+    max_rows: int = 1000,
+    environment: str = None,
+    use_cache: bool = True
+) -> Iterator[Dict]:
+    """Yield query rows, reusing rows cached on disk by a recent identical query.
+
+    Cached rows are stored one JSON object per line and expire after
+    CACHE_TTL_SECONDS, since relative time ranges such as -1d move forward.
+    On a miss, rows are written to the cache as they are yielded and the
+    entry only becomes visible once the query has been fully consumed.
+    Unreadable or corrupt entries are deleted and count as a miss.
+    """
+    if not use_cache:
+        yield from iter_events(service, query, tenant_id, max_rows)
+        return
+
+    cache_path = get_cache_path(environment or 'default', tenant_id, query, max_rows)
+
+    # Expired entries hold tenant data, so drop them rather than leave them behind
+    prune_cache()
+
+    if cache_path.is_file():
+        # Parse the whole entry before yielding any row: callers count and
+        # spool rows as they arrive, so a corrupt line found halfway through
+        # could no longer fall back to a fresh query
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    json.loads(line)
+            cache_hit = True
+        except (OSError, ValueError) as e:
+            # Unreadable or corrupt cache entries are treated as a miss
+            print(f"Warning: ignoring unreadable cache file {cache_path}: {e}", file=sys.stderr)
+            cache_path.unlink(missing_ok=True)
+            cache_hit = False
+
+        if cache_hit:
+            print(f"Using cached results from: {cache_path}")
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    yield json.loads(line)
+            return
 
-    return dict(aggregated)
+    try:
+        # Cached rows are tenant event data: keep them private to the current user
+        CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        CACHE_DIR.chmod(0o700)
+        # NamedTemporaryFile creates the file with mode 0600 under a unique name
+        cache_file = tempfile.NamedTemporaryFile(
+            mode='w', encoding='utf-8', dir=CACHE_DIR, suffix='.tmp', delete=False
+        )
+        tmp_path = Path(cache_file.name)
+    except OSError as e:
+        print(f"Warning: could not write cache file {cache_path}: {e}", file=sys.stderr)
+        cache_file = None
 
+    try:
+        for row in iter_events(service, query, tenant_id, max_rows):
+            if cache_file is not None:
+                try:
+                    cache_file.write(json.dumps(row))
+                    cache_file.write('\n')
+                except (OSError, TypeError, ValueError) as e:
+                    print(f"Warning: could not write cache file {cache_path}: {e}", file=sys.stderr)
+                    discard_cache_file(cache_file, tmp_path)
+                    cache_file = None
+            yield row
+
+        if cache_file is not None:
+            # The query itself succeeded, so failing to save it is only a warning
+            try:
+                cache_file.close()
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                print(f"Warning: could not write cache file {cache_path}: {e}", file=sys.stderr)
+                discard_cache_file(cache_file, tmp_path)
+            cache_file = None
+    finally:
+        # Interrupted or failed queries must not leave a partial cache entry
+        if cache_file is not None:
+            discard_cache_file(cache_file, tmp_path)
+
+
+def get_sensor_key(event: Dict) -> Tuple[str, str]:
+    """Return the (sensor_id, sensor_type) key for an event."""
+    # Handle None values and missing keys, and convert to string in case they're not already
+    sensor_id = str(event.get('sensor_id') or 'unknown')
+    sensor_type = str(event.get('sensor_type') or 'unknown')
+    return sensor_id, sensor_type
+
+
+def get_spool_path(spool_dir: Path, key: Tuple[str, str]) -> Path:
+    """Return the spool file path for a log source."""
+    digest = hashlib.sha256('\0'.join(key).encode('utf-8')).hexdigest()
+    return spool_dir / f"{digest}.txt"
+
+
+def spool_events_by_source(events: Iterable[Dict], spool_dir: Path) -> Tuple[Counter, Counter]:
+    """Count events by sensor_id and sensor_type, spooling original_data to disk.
+
+    Each log source's original_data lines are appended to its own file in
+    spool_dir, already in the export format, so exporting a source later is
+    just a rename when spool_dir is on the output file's filesystem. Lines are buffered per source and all buffers are
+    flushed once SPOOL_BUFFER_SIZE bytes are pending.
+
+    Returns the event counts and the spooled line counts per log source.
+    """
+    counts = Counter()
+    line_counts = Counter()
+    buffers = {}
+    pending = 0
+
+    def flush():
+        for key, buf in buffers.items():
+            spool_path = get_spool_path(spool_dir, key)
+            try:
+                with open(spool_path, 'ab') as f:
+                    f.write(buf)
+            except OSError as e:
+                print(f"Error writing to file {spool_path}: {e}", file=sys.stderr)
+                sys.exit(1)
+        buffers.clear()
 
-def display_aggregated_sources(aggregated: Dict[Tuple[str, str], List[Dict]]) -> None:
+    for event in events:
+        key = get_sensor_key(event)
+        counts[key] += 1
+        original_data = event.get('original_data')
+        if original_data is not None:
+            # Convert to string if it's not already
+            line = str(original_data).encode('utf-8') + b'\n'
+            buffers.setdefault(key, bytearray()).extend(line)
+            line_counts[key] += 1
+            pending += len(line)
+            if pending >= SPOOL_BUFFER_SIZE:
+                flush()
+                pending = 0
+    flush()
+
+    return counts, line_counts
+
+
+def sort_sources(counts: Counter, limit: int = None) -> List[Tuple[Tuple[str, str], int]]:
+    """Sort log sources by count (descending) then by sensor_id and sensor_type.
+
+    With a limit, only the top entries are selected using a bounded heap,
+    which avoids sorting every source when there are thousands of them.
+    """
+    def sort_key(x):
+        return (-x[1], x[0][0], x[0][1])
+
+    if limit is not None and limit < len(counts):
+        return heapq.nsmallest(limit, counts.items(), key=sort_key)
+    return sorted(counts.items(), key=sort_key)
+
+
+def display_aggregated_sources(sorted_sources: List[Tuple[Tuple[str, str], int]], total_sources: int) -> None:
     """Display aggregated log sources with counts."""
     print("\n" + "="*80)
     print("Available Log Sources (sensor_id, sensor_type):")
     print("="*80)
 
-    # Sort by count (descending) then by sensor_id
-    sorted_sources = sorted(
-        aggregated.items(),
-        key=lambda x: (-len(x[1]), x[0][0], x[0][1])
-    )
-
-    for idx, ((sensor_id, sensor_type), events) in enumerate(sorted_sources, 1):
-        count = len(events)
+    for idx, ((sensor_id, sensor_type), count) in enumerate(sorted_sources, 1):
         print(f"{idx:3d}. sensor_id='{sensor_id}' sensor_type='{sensor_type}' - {count:,} events")
 
+    if len(sorted_sources) < total_sources:
+        print(f"... showing top {len(sorted_sources)} of {total_sources:,} log sources (use --show-all to list every source)")
+
     print("="*80)
 
 
-def select_log_source(aggregated: Dict[Tuple[str, str], List[Dict]]) -> Tuple[str, str]:
+def select_log_source(sorted_sources: List[Tuple[Tuple[str, str], int]]) -> Tuple[str, str]:
     """Prompt user to select a log source."""
-    sorted_sources = sorted(
-        aggregated.items(),
-        key=lambda x: (-len(x[1]), x[0][0], x[0][1])
-    )
-
     if not sorted_sources:
         print("No log sources found.", file=sys.stderr)
         sys.exit(1)
@@ -154,28 +365,137 @@ def select_log_source(aggregated: Dict[Tuple[str, str], List[Dict]]) -> Tuple[st
             sys.exit(0)
 
 
-def export_events_to_file(events: List[Dict], output_file: str) -> None:
-    """Export events to a text file, writing only the original_data field from each event, one per line."""
+def write_chunks(f, chunks: queue.Queue, errors: List[OSError]) -> None:
+    """Write chunks from a queue to a file until a None sentinel is received."""
+    while True:
+        chunk = chunks.get()
+        if chunk is None:
+            return
+        if errors:
+            # Keep draining after a failure so the producer never blocks
+            continue
+        try:
+            f.write(chunk)
+        except OSError as e:
+            errors.append(e)
+
+
+def get_output_mode(output_path: Path) -> int:
+    """Return the permission bits for the output file.
+
+    An existing output file keeps its mode; a new one gets the default mode
+    for the current umask, as a plain open() would have given it.
+    """
+    try:
+        return output_path.stat().st_mode & 0o777
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def replace_output_file(tmp_path: Path, output_file: str) -> None:
+    """Move a fully written temporary file over output_file.
+
+    The temporary file must be on the same filesystem as output_file, so the
+    replacement is atomic. The output keeps the mode of any existing file.
+    """
+    output_path = Path(output_file)
+    try:
+        os.chmod(tmp_path, get_output_mode(output_path))
+        os.replace(tmp_path, output_path)
+    except OSError as e:
+        tmp_path.unlink(missing_ok=True)
+        print(f"Error writing to file {output_file}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def export_events_to_file(original_data: Iterable[Any], output_file: str) -> None:
+    """Export events' original_data values to a text file, one per line.
+
+    Values may come from any iterable, so rows from a streaming query are
+    written as they arrive instead of being buffered in memory first. None
+    values (events without original_data) are skipped.
+
+    Lines are written to a temporary file beside output_file, which replaces
+    it only once the iterable has been fully consumed: if the query fails,
+    its exception propagates to the caller and any existing output file is
+    left untouched.
+    """
     output_path = Path(output_file)
 
     try:
-        # Extract only the original_data field from each event and write one per line
-        count = 0
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for event in events:
-                original_data = event.get('original_data')
-                if original_data is not None:
-                    # Write the original_data as a single line
-                    # Convert to string if it's not already
-                    data_str = str(original_data)
-                    f.write(data_str)
-                    f.write('\n')
-                    count += 1
-
-        print(f"\n✓ Successfully exported {count:,} events (original_data only, one per line) to: {output_path.absolute()}")
-    except Exception as e:
+        tmp_file = tempfile.NamedTemporaryFile(
+            mode='wb',
+            buffering=WRITE_CHUNK_SIZE,
+            dir=output_path.absolute().parent,
+            prefix=f".{output_path.name}.",
+            suffix='.tmp',
+            delete=False
+        )
+    except OSError as e:
         print(f"Error writing to file {output_file}: {e}", file=sys.stderr)
         sys.exit(1)
+    tmp_path = Path(tmp_file.name)
+
+    # Write one original_data value per line, coalescing lines into
+    # WRITE_CHUNK_SIZE chunks. Chunks are handed to a writer thread so
+    # disk writes overlap with fetching the next pages.
+    count = 0
+    buf = bytearray()
+    chunks = queue.Queue(maxsize=WRITE_QUEUE_DEPTH)
+    errors = []
+    writer = threading.Thread(target=write_chunks, args=(tmp_file, chunks, errors), daemon=True)
+    writer.start()
+
+    finished = False
+    try:
+        for data in original_data:
+            if data is not None:
+                # Convert to string if it's not already. Appending to a bytearray
+                # benchmarks at least as fast as map()/str.join batching here, and
+                # orjson.dumps would JSON-quote the raw log line
+                buf += str(data).encode('utf-8')
+                buf += b'\n'
+                count += 1
+                if len(buf) >= WRITE_CHUNK_SIZE:
+                    if errors:
+                        break
+                    chunks.put(buf)
+                    buf = bytearray()
+        if buf and not errors:
+            chunks.put(buf)
+        finished = True
+    finally:
+        chunks.put(None)
+        writer.join()
+        try:
+            tmp_file.close()
+        except OSError as e:
+            errors.append(e)
+        if not finished or errors:
+            tmp_path.unlink(missing_ok=True)
+
+    if errors:
+        print(f"Error writing to file {output_file}: {errors[0]}", file=sys.stderr)
+        sys.exit(1)
+    replace_output_file(tmp_path, output_file)
+
+    print(f"\n✓ Successfully exported {count:,} events (original_data only, one per line) to: {output_path.absolute()}")
+
+
+def export_spooled_source(spool_path: Path, count: int, output_file: str) -> None:
+    """Export a log source spooled by spool_events_by_source by renaming its spool file."""
+    if not spool_path.exists():
+        # None of the source's events had original_data
+        try:
+            spool_path.touch()
+        except OSError as e:
+            print(f"Error writing to file {output_file}: {e}", file=sys.stderr)
+            sys.exit(1)
+    replace_output_file(spool_path, output_file)
+
+    print(f"\n✓ Successfully exported {count:,} events (original_data only, one per line) to: {Path(output_file).absolute()}")
 
 
 def main():
@@ -188,6 +508,8 @@ Examples:
   python export_unparsed_events.py tenant123 events.json
   python export_unparsed_events.py tenant123 events.json --environment US1
   python export_unparsed_events.py tenant123 events.json --max-rows 50000
+  python export_unparsed_events.py tenant123 events.json --no-cache
+  python export_unparsed_events.py tenant123 events.json --show-all
 
 Authentication:
   The tool uses OAuth authentication via CLIENT_ID and CLIENT_SECRET
@@ -234,8 +556,25 @@ Environment Options:
         default='-1d'
     )
 
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always query the API instead of reusing results cached in ~/.cache/taegis'
+    )
+
+    parser.add_argument(
+        '--show-all',
+        action='store_true',
+        help=f'List every log source instead of only the top {TOP_SOURCES}'
+    )
+
     args = parser.parse_args()
 
+    output_path = Path(args.output_file)
+    if output_path.is_dir():
+        print(f"Error writing to file {args.output_file}: Is a directory", file=sys.stderr)
+        sys.exit(1)
+
     # Initialize the Taegis service
     try:
         if args.environment:
@@ -249,48 +588,77 @@ Environment Options:
         sys.exit(1)
 
     # Step 1: Query unparsed events
-    query = f"FROM generic EARLIEST={args.time_range}"
+    query = UNPARSED_QUERY.format(time_range=args.time_range)
     print(f"Querying unparsed events for tenant: {args.tenant_id}")
     print(f"Query: {query}")
     print("This may take a while...")
 
+    # Step 2: Aggregate by sensor_id and sensor_type as pages arrive, spooling
+    # each log source's original_data so the selected one can be exported
+    # without querying again. The spool directory sits beside the output file
+    # so the export is an atomic rename, and is removed on every exit path.
     try:
-        events = query_events(service, query, args.tenant_id, args.max_rows)
-        print(f"\n✓ Retrieved {len(events):,} events")
-    except Exception as e:
-        print(f"Error querying events: {e}", file=sys.stderr)
+        spool = tempfile.TemporaryDirectory(prefix=f".{output_path.name}.", dir=output_path.absolute().parent)
+    except OSError as e:
+        print(f"Error writing to file {args.output_file}: {e}", file=sys.stderr)
         sys.exit(1)
+    with spool as spool_name:
+        spool_dir = Path(spool_name)
+        try:
+            counts, line_counts = spool_events_by_source(iter_cached_events(
+                service, query, args.tenant_id, args.max_rows, args.environment, not args.no_cache
+            ), spool_dir)
+            total_events = sum(counts.values())
+            print(f"\n✓ Retrieved {total_events:,} events")
+        except Exception as e:
+            print(f"Error querying events: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        if not total_events:
+            print("No events found for the specified tenant and time range.")
+            sys.exit(0)
 
-    if not events:
-        print("No events found for the specified tenant and time range.")
-        sys.exit(0)
-
-    # Step 2: Aggregate by sensor_id and sensor_type
-    print("\nAggregating events by sensor_id and sensor_type...")
-    aggregated = aggregate_by_sensor(events)
+        sorted_sources = sort_sources(counts, None if args.show_all else TOP_SOURCES)
 
-    # Step 3: Display aggregated sources
-    display_aggregated_sources(aggregated)
+        # Step 3: Display aggregated sources
+        display_aggregated_sources(sorted_sources, len(counts))
 
-    # Step 4: Get user selection
-    sensor_id, sensor_type = select_log_source(aggregated)
+        # Step 4: Get user selection
+        sensor_id, sensor_type = select_log_source(sorted_sources)
 
-    # Step 5: Query events for selected log source
-    print(f"\nQuerying events for sensor_id='{sensor_id}' sensor_type='{sensor_type}'...")
-    # Escape single quotes in sensor_id and sensor_type for CQL
-    sensor_id_escaped = sensor_id.replace("'", "''")
-    sensor_type_escaped = sensor_type.replace("'", "''")
-    filtered_query = f"FROM generic WHERE sensor_id='{sensor_id_escaped}' AND sensor_type='{sensor_type_escaped}' EARLIEST={args.time_range}"
+        # Step 5: Collect events for selected log source
+        selected_key = (sensor_id, sensor_type)
+        if total_events < args.max_rows:
+            # The initial query returned every matching event, so the selected
+            # log source is already complete in its spool file
+            print(f"✓ Using {counts[selected_key]:,} events already retrieved for selected log source")
 
-    try:
-        selected_events = query_events(service, filtered_query, args.tenant_id, args.max_rows)
-        print(f"✓ Retrieved {len(selected_events):,} events for selected log source")
-    except Exception as e:
-        print(f"Error querying selected events: {e}", file=sys.stderr)
-        sys.exit(1)
-
-    # Step 6: Export to file
-    export_events_to_file(selected_events, args.output_file)
+            # Step 6: Export to file
+            export_spooled_source(get_spool_path(spool_dir, selected_key), line_counts[selected_key], args.output_file)
+        else:
+            # The initial query was truncated by --max-rows; re-query so the
+            # selected log source gets its own max_rows budget. Its spool file
+            # goes unused: truncation is only known once the stream has ended.
+            print(f"\nQuerying events for sensor_id='{sensor_id}' sensor_type='{sensor_type}'...")
+            filtered_query = UNPARSED_SOURCE_QUERY.format(
+                sensor_id=cql_string(sensor_id),
+                sensor_type=cql_string(sensor_type),
+                time_range=args.time_range
+            )
+
+            # Rows are streamed straight into the export file as pages arrive
+            selected_data = (
+                event.get('original_data') for event in iter_cached_events(
+                    service, filtered_query, args.tenant_id, args.max_rows, args.environment, not args.no_cache
+                )
+            )
+
+            # Step 6: Export to file
+            try:
+                export_events_to_file(selected_data, args.output_file)
+            except Exception as e:
+                print(f"Error querying selected events: {e}", file=sys.stderr)
+                sys.exit(1)
 
 
 if __name__ == '__main__':
@@ -1,12 +1,13 @@
 #!/usr/bin/env python3
 """
-Command line tool to validate a .PAR file against the Taegis API.
+Command line tool to validate .PAR files against the Taegis API.
 
 This tool uses the Taegis SDK to validate parser files (.PAR) by calling
-the validate_parser endpoint from the Roadrunner service.
+the validate_parser endpoint from the Roadrunner service. Several files can
+be validated at once, in a single API request.
 
 Usage:
-    python validate_parser.py <path_to_par_file>
+    python validate_parser.py <path_to_par_file> [<path_to_par_file> ...]
     
 Environment Variables:
     CLIENT_ID: Taegis API client ID (required for OAuth authentication)
@@ -16,20 +17,32 @@ Environment Variables:
 """
 
 import argparse
+import hashlib
+import json
+import os
 import sys
+import tempfile
+import time
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
 
 try:
     from taegis_sdk_python import GraphQLService
-    from taegis_sdk_python.services.roadrunner.types import UnvalidatedParserInput
+    from taegis_sdk_python.services.roadrunner.types import UnvalidatedParserInput, ValidateResult
+    from taegis_sdk_python.utils import prepare_input
 except ImportError:
     print("Error: taegis-sdk-python is not installed.", file=sys.stderr)
     print("Please install it with: pip install taegis-sdk-python", file=sys.stderr)
     sys.exit(1)
 
 
-def read_par_file(file_path: str) -> str:
-    """Read the contents of a .PAR file."""
+CACHE_DIR = Path("~/.cache/taegis-validate").expanduser()
+CACHE_TTL_SECONDS = 86400
+VALIDATE_BATCH_SIZE = 20
+
+
+def read_par_file(file_path: str) -> Tuple[bytes, str]:
+    """Read the contents of a .PAR file, with newlines normalised, and their SHA-256 digest."""
     path = Path(file_path)
     
     if not path.exists():
@@ -41,69 +54,253 @@ def read_par_file(file_path: str) -> str:
         sys.exit(1)
     
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            return f.read()
+        data = path.read_bytes()
     except Exception as e:
         print(f"Error reading file {file_path}: {e}", file=sys.stderr)
         sys.exit(1)
+    
+    # Normalise \r\n and \r to \n as text-mode reads do, and hash the
+    # normalised code so the cache key matches what is submitted. Decoding is
+    # left until the cache has been checked.
+    if b'\r' in data:
+        data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    return data, hashlib.sha256(data).hexdigest()
 
 
-def validate_parser_file(par_file_path: str, environment: str = None, parent_id: int = 0) -> None:
-    """Validate a .PAR file using the Taegis API."""
-    # Read the .PAR file content
-    parser_code = read_par_file(par_file_path)
-    
-    # Initialize the Taegis service
+def decode_par_code(data: bytes, file_path: str) -> str:
+    """Decode the contents of a .PAR file as UTF-8."""
     try:
-        if environment:
-            service = GraphQLService(environment=environment)
-        else:
-            service = GraphQLService()
-    except Exception as e:
-        print(f"Error initializing Taegis service: {e}", file=sys.stderr)
-        print("\nMake sure you have set CLIENT_ID and CLIENT_SECRET environment variables", file=sys.stderr)
-        print("or are ready to authenticate via device code.", file=sys.stderr)
+        return data.decode('utf-8')
+    except UnicodeDecodeError as e:
+        print(f"Error reading file {file_path}: {e}", file=sys.stderr)
         sys.exit(1)
+
+
+def init_service(environment: str = None) -> GraphQLService:
+    """Create the Taegis service and authenticate it."""
+    if environment:
+        service = GraphQLService(environment=environment)
+    else:
+        service = GraphQLService()
+    # Constructing the service does no I/O: fetch the token now so that
+    # authentication problems are reported as such
+    service.access_token
+    return service
+
+
+def get_cache_path(code_hash: str, parent_id: int, environment: str = None) -> Path:
+    """Return the cache file path for a validation request."""
+    return CACHE_DIR / f"{environment or 'default'}_{parent_id}_{code_hash}.json"
+
+
+def prune_cache() -> None:
+    """Delete cache entries, and temp files left by killed runs, older than CACHE_TTL_SECONDS."""
+    cutoff = time.time() - CACHE_TTL_SECONDS
+    try:
+        entries = list(CACHE_DIR.iterdir())
+    except OSError:
+        return
+    for entry in entries:
+        if entry.suffix not in ('.json', '.tmp'):
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                entry.unlink()
+        except OSError:
+            pass
+
+
+def load_cached_result(cache_path: Path) -> Optional[Dict]:
+    """Load a cached validation result, or None if there is no fresh entry."""
+    try:
+        if time.time() - cache_path.stat().st_mtime >= CACHE_TTL_SECONDS:
+            cache_path.unlink()
+            return None
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        return {'ok': bool(cached['ok']), 'message': cached.get('message')}
+    except (OSError, ValueError, KeyError, TypeError):
+        # Missing, unreadable or corrupt cache entries are treated as a miss
+        return None
+
+
+def store_cached_result(cache_path: Path, ok: bool, message: str) -> None:
+    """Store a validation result in the cache."""
+    tmp_path = None
+    try:
+        # Keep cached results private to the current user
+        CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        CACHE_DIR.chmod(0o700)
+        # NamedTemporaryFile creates the file with mode 0600 under a unique name
+        with tempfile.NamedTemporaryFile(
+            mode='w', encoding='utf-8', dir=CACHE_DIR, suffix='.tmp', delete=False
+        ) as f:
+            tmp_path = f.name
+            json.dump({'ok': ok, 'message': message}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Warning: could not write cache file {cache_path}: {e}", file=sys.stderr)
+        if tmp_path is not None:
+            Path(tmp_path).unlink(missing_ok=True)
+
+
+def print_validation_result(ok: bool, message: str, par_file_path: str = None) -> None:
+    """Display a validation result."""
+    print("\n" + "="*60)
+    print("Validation Results:")
+    print("="*60)
     
-    # Create the parser input with required parent_id
-    parser_input = UnvalidatedParserInput(code=parser_code, parent_id=parent_id)
+    if par_file_path:
+        print(f"File: {par_file_path}")
+    if ok:
+        print("Status: ✓ VALID")
+        if message:
+            print(f"Message: {message}")
+    else:
+        print("Status: ✗ INVALID")
+        if message:
+            print(f"Error: {message}")
     
-    # Validate the parser
-    try:
+    print("="*60)
+
+
+def validate_batch(service: GraphQLService, parser_inputs: List[UnvalidatedParserInput]) -> List[ValidateResult]:
+    """Validate several parsers with a single GraphQL request.
+
+    Each parser gets its own aliased validateParser field in one query
+    document, so N files cost one network round-trip instead of N.
+    """
+    endpoint = "validateParser"
+    argument = "unvalidatedParser"
+    
+    # Take the argument type from the schema rather than hard-coding it
+    graphql_field = service.roadrunner.get_sync_schema().query_type.fields[endpoint]
+    argument_type = graphql_field.args[argument].type
+    
+    declarations = ", ".join(f"$p{i}: {argument_type}" for i in range(len(parser_inputs)))
+    fields = " ".join(
+        f"v{i}: {endpoint}({argument}: $p{i}) {{ ok message }}" for i in range(len(parser_inputs))
+    )
+    query_string = f"query validateParsers({declarations}) {{ {fields} }}"
+    variables = {f"p{i}": prepare_input(parser_input) for i, parser_input in enumerate(parser_inputs)}
+    
+    result = service.roadrunner.execute(query_string, variables)
+    
+    results = []
+    for i in range(len(parser_inputs)):
+        if result.get(f"v{i}") is None:
+            raise ValueError(f"No validation result returned for parser {i + 1}")
+        results.append(ValidateResult.from_dict(result[f"v{i}"]))
+    return results
+
+
+def validate_parsers(
+    service: GraphQLService,
+    parser_inputs: List[UnvalidatedParserInput]
+) -> List[Union[ValidateResult, Exception]]:
+    """Validate a batch of parsers, returning a result or the error for each one.
+
+    A GraphQL error on any aliased field fails the whole batched response, so
+    when the batch request fails each parser is validated on its own to tell
+    which one the error belongs to.
+    """
+    if len(parser_inputs) > 1:
+        try:
+            return validate_batch(service, parser_inputs)
+        except Exception:
+            pass
+    
+    outcomes = []
+    for parser_input in parser_inputs:
+        try:
+            outcomes.append(service.roadrunner.query.validate_parser(parser_input))
+        except Exception as e:
+            outcomes.append(e)
+    return outcomes
+
+
+def validate_parser_files(
+    par_file_paths: List[str],
+    environment: str = None,
+    parent_id: int = 0,
+    use_cache: bool = True
+) -> None:
+    """Validate one or more .PAR files using the Taegis API.
+
+    Results are cached on disk keyed by the file content, parent_id and
+    environment, so re-validating an unchanged file skips the API call.
+    Files without a cached result are validated in batches of up to
+    VALIDATE_BATCH_SIZE files per request.
+    """
+    # Read the .PAR file contents
+    parser_data, code_hashes = zip(*[read_par_file(par_file_path) for par_file_path in par_file_paths])
+    
+    for par_file_path in par_file_paths:
         print(f"Validating parser file: {par_file_path}")
-        print(f"Using parent_id: {parent_id}")
-        print("Connecting to Taegis API...")
-        
-        result = service.roadrunner.query.validate_parser(parser_input)
-        
-        # Display results
-        print("\n" + "="*60)
-        print("Validation Results:")
-        print("="*60)
+    print(f"Using parent_id: {parent_id}")
+    
+    # Reuse previous results for identical parser code
+    cache_paths = [get_cache_path(code_hash, parent_id, environment) for code_hash in code_hashes]
+    results = [None] * len(par_file_paths)
+    if use_cache:
+        # Expired entries are never read again, so drop them
+        prune_cache()
+        for i, cache_path in enumerate(cache_paths):
+            results[i] = load_cached_result(cache_path)
+            if results[i] is not None:
+                print(f"Using cached result from: {cache_path}")
+    pending = [i for i, result in enumerate(results) if result is None]
+    
+    if pending:
+        # Only files without a cached result need decoding and the API
+        parser_codes = {i: decode_par_code(parser_data[i], par_file_paths[i]) for i in pending}
         
-        if result.ok:
-            print("Status: ✓ VALID")
-            if result.message:
-                print(f"Message: {result.message}")
-        else:
-            print("Status: ✗ INVALID")
-            if result.message:
-                print(f"Error: {result.message}")
+        # Initialize the Taegis service
+        try:
+            service = init_service(environment)
+        except Exception as e:
+            print(f"Error initializing Taegis service: {e}", file=sys.stderr)
+            print("\nMake sure you have set CLIENT_ID and CLIENT_SECRET environment variables", file=sys.stderr)
+            print("or are ready to authenticate via device code.", file=sys.stderr)
+            sys.exit(1)
         
-        print("="*60)
+        # Create the parser inputs with required parent_id
+        parser_inputs = [
+            UnvalidatedParserInput(code=parser_codes[i], parent_id=parent_id) for i in pending
+        ]
         
-        # Exit with appropriate code
-        sys.exit(0 if result.ok else 1)
+        # Validate the parsers, keeping each request document bounded
+        print("Connecting to Taegis API...")
+        validated = []
+        for start in range(0, len(parser_inputs), VALIDATE_BATCH_SIZE):
+            validated.extend(validate_parsers(service, parser_inputs[start:start + VALIDATE_BATCH_SIZE]))
         
-    except Exception as e:
-        print(f"Error validating parser: {e}", file=sys.stderr)
-        sys.exit(1)
+        # Only results the API returned are cached; request errors are not
+        for i, result in zip(pending, validated):
+            if isinstance(result, Exception):
+                results[i] = {'error': result}
+            else:
+                results[i] = {'ok': bool(result.ok), 'message': result.message}
+                store_cached_result(cache_paths[i], results[i]['ok'], results[i]['message'])
+    
+    # Display results
+    for par_file_path, result in zip(par_file_paths, results):
+        if 'error' in result:
+            file_label = f" {par_file_path}" if len(par_file_paths) > 1 else ""
+            print(f"Error validating parser{file_label}: {result['error']}", file=sys.stderr)
+            continue
+        print_validation_result(
+            result['ok'], result['message'], par_file_path if len(par_file_paths) > 1 else None
+        )
+    
+    # Exit with appropriate code
+    sys.exit(0 if all(result.get('ok') for result in results) else 1)
 
 
 def main():
     """Main entry point for the CLI tool."""
     parser = argparse.ArgumentParser(
-        description="Validate a .PAR file against the Taegis API",
+        description="Validate .PAR files against the Taegis API",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
@@ -111,6 +308,8 @@ Examples:
   python validate_parser.py my_parser.par --environment US1
   python validate_parser.py my_parser.par --environment US2 --parent-id 0
   python validate_parser.py my_parser.par --parent-id 123
+  python validate_parser.py my_parser.par --no-cache
+  python validate_parser.py parsers/*.par
 
 Authentication:
   The tool uses OAuth authentication via CLIENT_ID and CLIENT_SECRET
@@ -126,8 +325,9 @@ Environment Options:
     )
     
     parser.add_argument(
-        'par_file',
-        help='Path to the .PAR file to validate'
+        'par_files',
+        nargs='+',
+        help='Path to the .PAR file(s) to validate'
     )
     
     parser.add_argument(
@@ -145,9 +345,15 @@ Environment Options:
         default=0
     )
     
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always call the API instead of reusing results cached in ~/.cache/taegis-validate'
+    )
+    
     args = parser.parse_args()
     
-    validate_parser_file(args.par_file, args.environment, args.parent_id)
+    validate_parser_files(args.par_files, args.environment, args.parent_id, not args.no_cache)
 
 
 if __name__ == '__main__':